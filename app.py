@@ -1,8 +1,11 @@
 ﻿import streamlit as st
 import pandas as pd
-import json
+import numpy as np
+import orjson
+import functools
 from datetime import datetime, date, time, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, ClassVar
+from dataclasses import dataclass
 from streamlit_calendar import calendar
 
 # ==========================================
@@ -23,16 +26,91 @@ class GameConfig:
         "Status": True, 
         "Color": "#33B679"
     }
+    
+    # Built once so every rerun hands the calendar component the same object
+    CALENDAR_OPTIONS = {
+        "initialView": "timeGridWeek", 
+        "headerToolbar": {"left": "prev,next", "center": "title", "right": "dayGridMonth,timeGridWeek"}
+    }
 
 # ==========================================
 # 2. DOMAIN MODEL & LOGIC (Service Layer)
 # ==========================================
+@dataclass
+class Tasks:
+    """Column store for quests: one NumPy array per field (struct-of-arrays).
+
+    Game logic reads the arrays directly; a DataFrame is only built at the
+    st.data_editor boundary via to_frame().
+    """
+    title: np.ndarray        # object (str)
+    description: np.ndarray  # object (str)
+    date: np.ndarray         # datetime64[D]
+    start: np.ndarray        # object (datetime.time)
+    end: np.ndarray          # object (datetime.time)
+    status: np.ndarray       # bool
+    color: np.ndarray        # object (str)
+
+    # Field -> DataFrame/save-file column name
+    COLUMNS: ClassVar[Dict[str, str]] = {
+        "title": "Title", "description": "Description", "date": "Date",
+        "start": "Start", "end": "End", "status": "Status", "color": "Color",
+    }
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> "Tasks":
+        """Builds typed arrays from raw column values; blank editor cells (None/NaN) count as not done."""
+        status = np.asarray(columns["status"], dtype=object)
+        return cls(
+            title=np.asarray(columns["title"], dtype=object),
+            description=np.asarray(columns["description"], dtype=object),
+            date=np.asarray(pd.to_datetime(columns["date"])).astype('datetime64[D]'),
+            start=np.asarray(columns["start"], dtype=object),
+            end=np.asarray(columns["end"], dtype=object),
+            status=np.where(pd.isna(status), False, status).astype(np.bool_),
+            color=np.asarray(columns["color"], dtype=object),
+        )
+
+    @classmethod
+    def from_records(cls, rows: List[Dict]) -> "Tasks":
+        return cls.from_columns({f: [row.get(c) for row in rows] for f, c in cls.COLUMNS.items()})
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "Tasks":
+        return cls.from_columns({f: df[c].to_numpy() for f, c in cls.COLUMNS.items()})
+
+    def append(self, other: "Tasks") -> "Tasks":
+        return Tasks(**{f: np.concatenate([getattr(self, f), getattr(other, f)]) for f in self.COLUMNS})
+
+    def to_records(self) -> List[Dict]:
+        columns = [getattr(self, f).tolist() for f in self.COLUMNS]
+        return [dict(zip(self.COLUMNS.values(), row)) for row in zip(*columns)]
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = {c: getattr(self, f) for f, c in self.COLUMNS.items()}
+        frame["Date"] = self.date.astype(object)  # datetime.date for the editor's date picker
+        return pd.DataFrame(frame)
+
+    def fingerprint(self) -> tuple:
+        """Cheap content signature used to detect edits without a cell-by-cell compare."""
+        row_hash = np.zeros(len(self), dtype=np.uint64)
+        for f in self.COLUMNS:
+            row_hash = (row_hash * np.uint64(1000003)) ^ pd.util.hash_array(getattr(self, f))
+        return len(self), int(row_hash.sum())
+
+def _streak_scan(days: np.ndarray) -> int:
+    """Length of the leading run of consecutive days in a descending int64 day-number array."""
+    breaks = np.flatnonzero(days[:-1] - days[1:] != 1)
+    return int(breaks[0]) + 1 if breaks.size else int(days.size)
+
 class GamificationService:
     """Handles XP, Levels, and Streak Logic. Pure Python, no UI code."""
     
     @staticmethod
-    def calculate_stats(df: pd.DataFrame, boss_xp: int) -> Dict[str, Any]:
-        completed_count = df['Status'].sum() if not df.empty else 0
+    def calculate_stats(completed_count: int, boss_xp: int) -> Dict[str, Any]:
         current_xp = (completed_count * GameConfig.XP_PER_TASK) + boss_xp
         level = (current_xp // GameConfig.LEVEL_BASE_XP) + 1
         progress = (current_xp % GameConfig.LEVEL_BASE_XP) / GameConfig.LEVEL_BASE_XP
@@ -44,33 +122,23 @@ class GamificationService:
         }
 
     @staticmethod
-    def calculate_streak(df: pd.DataFrame) -> int:
-        """Calculates consecutive days ending today or yesterday."""
-        if df.empty: return 0
-        
-        # Filter for completed tasks only
-        completed = df[df['Status'] == True]
-        if completed.empty: return 0
-        
-        # Get unique dates sorted descending
-        dates = sorted(completed['Date'].unique(), reverse=True)
-        
-        today = date.today()
-        if not dates: return 0
+    @st.cache_data(show_spinner=False)
+    def calculate_streak(completed_dates: np.ndarray, today: Optional[date] = None) -> int:
+        """Calculates consecutive days ending today or yesterday.
+
+        `completed_dates` is the datetime64[D] Date column of completed tasks
+        (`tasks.date[tasks.status]`). `today` is part of the cache key so a
+        cached streak expires at midnight.
+        """
+        # Unique completion days, most recent first
+        days = np.unique(completed_dates[~np.isnat(completed_dates)])[::-1]
+        if days.size == 0: return 0
         
         # Streak broken if last task was before yesterday
-        if (today - dates[0]).days > 1: return 0
-        
-        streak = 1
-        current_date = dates[0]
+        today = np.datetime64(today or date.today(), 'D')
+        if (today - days[0]).astype(int) > 1: return 0
         
-        for i in range(1, len(dates)):
-            if (current_date - dates[i]).days == 1:
-                streak += 1
-                current_date = dates[i]
-            else:
-                break
-        return streak
+        return _streak_scan(days.view('int64'))
 
 class BossManager:
     """Manages Boss state and combat logic."""
@@ -84,11 +152,13 @@ class BossManager:
 # ==========================================
 # 3. DATA PERSISTENCE (Repository Layer)
 # ==========================================
-class DateEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (date, time)):
-            return obj.isoformat()
-        return super().default(obj)
+def _json_default(obj):
+    """Fallback for values orjson can't serialize natively (e.g. pandas NaT/Timestamp)."""
+    if pd.isna(obj):
+        return None
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError
 
 class StateRepository:
     """Handles saving/loading and Session State management."""
@@ -96,36 +166,67 @@ class StateRepository:
     @staticmethod
     def initialize_session():
         if 'tasks' not in st.session_state:
-            st.session_state.tasks = pd.DataFrame([GameConfig.DEFAULT_TASK])
+            StateRepository.set_tasks(Tasks.from_records([GameConfig.DEFAULT_TASK]))
         if 'boss_xp' not in st.session_state:
             st.session_state.boss_xp = 0
         if 'active_boss' not in st.session_state:
             st.session_state.active_boss = None
+        if 'pending_rows' not in st.session_state:
+            st.session_state.pending_rows = []
+        if 'export_cache' not in st.session_state:
+            st.session_state.export_cache = {"hash": None, "json": ""}
+
+    @staticmethod
+    def set_tasks(tasks: Tasks):
+        st.session_state.tasks = tasks
+        st.session_state.tasks_fingerprint = tasks.fingerprint()
+
+    @staticmethod
+    def get_tasks() -> Tasks:
+        """Returns the task store, folding in quests queued by the sidebar with a single append."""
+        pending = st.session_state.pending_rows
+        if pending:
+            StateRepository.set_tasks(st.session_state.tasks.append(Tasks.from_records(pending)))
+            st.session_state.pending_rows = []
+        return st.session_state.tasks
+
+    @staticmethod
+    def _parse_iso(values: pd.Series, parse) -> pd.Series:
+        """Parses each distinct ISO string once; save files repeat the same days and round-hour times."""
+        return values.map({s: parse(s) for s in values.unique()})
 
     @staticmethod
     def export_data() -> str:
-        data = {
-            "tasks": st.session_state.tasks.to_dict(orient="records"),
-            "boss_xp": st.session_state.boss_xp,
-            "active_boss": st.session_state.active_boss
-        }
-        return json.dumps(data, cls=DateEncoder)
+        """Serializes the game state, reusing the last JSON string while the state is unchanged."""
+        tasks = StateRepository.get_tasks()
+        state_hash = (st.session_state.tasks_fingerprint, st.session_state.boss_xp, repr(st.session_state.active_boss))
+        cache = st.session_state.export_cache
+        if cache["hash"] != state_hash:
+            data = {
+                "tasks": tasks.to_records(),
+                "boss_xp": st.session_state.boss_xp,
+                "active_boss": st.session_state.active_boss
+            }
+            cache["json"] = orjson.dumps(data, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+            cache["hash"] = state_hash
+        return cache["json"]
 
     @staticmethod
     def load_data(json_data: Dict):
         try:
             st.session_state.boss_xp = json_data.get("boss_xp", 0)
             st.session_state.active_boss = json_data.get("active_boss", None)
+            st.session_state.pending_rows = []
             
             tasks = json_data.get("tasks", [])
             if tasks:
                 df = pd.DataFrame(tasks)
-                df['Date'] = df['Date'].apply(lambda x: date.fromisoformat(x))
-                df['Start'] = df['Start'].apply(lambda x: time.fromisoformat(x))
-                df['End'] = df['End'].apply(lambda x: time.fromisoformat(x))
-                st.session_state.tasks = df
+                df['Date'] = StateRepository._parse_iso(df['Date'], date.fromisoformat)
+                df['Start'] = StateRepository._parse_iso(df['Start'], time.fromisoformat)
+                df['End'] = StateRepository._parse_iso(df['End'], time.fromisoformat)
+                StateRepository.set_tasks(Tasks.from_frame(df))
             else:
-                st.session_state.tasks = pd.DataFrame(columns=GameConfig.DEFAULT_TASK.keys())
+                StateRepository.set_tasks(Tasks.from_records([]))
             
             st.success("✅ Save file loaded successfully!")
             st.rerun()
@@ -135,7 +236,24 @@ class StateRepository:
 # ==========================================
 # 4. UI COMPONENTS (Presentation Layer)
 # ==========================================
+def _seconds_of_day(times: np.ndarray) -> np.ndarray:
+    """datetime.time array -> timedelta64[s] offsets from midnight."""
+    secs = np.fromiter((t.hour * 3600 + t.minute * 60 + t.second for t in times), dtype=np.int64, count=len(times))
+    return secs.astype('timedelta64[s]')
+
 class UI:
+    # Indexed by Status (False -> 0, True -> 1) so event titles are a gather, not a branch
+    STATUS_EMOJI = np.array(['⬜ ', '✅ '], dtype=object)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def editor_columns() -> Dict[str, Any]:
+        """Column config for the quest editor, built on first render and reused after."""
+        return {
+            "Title": st.column_config.TextColumn(required=True),
+            "Status": st.column_config.CheckboxColumn(help="Mark done for XP", default=False),
+            "Color": st.column_config.ColorPickerColumn()
+        }
     
     @staticmethod
     def render_sidebar():
@@ -148,7 +266,7 @@ class UI:
             
             uploaded = st.file_uploader("📤 Load Game", type=["json"])
             if uploaded and st.button("Restore"):
-                StateRepository.load_data(json.load(uploaded))
+                StateRepository.load_data(orjson.loads(uploaded.read()))
             
             st.divider()
             
@@ -164,7 +282,7 @@ class UI:
                 
                 if st.form_submit_button("Add"):
                     new_row = {"Title": title, "Description": desc, "Date": d, "Start": t_s, "End": t_e, "Status": False, "Color": color}
-                    st.session_state.tasks = pd.concat([st.session_state.tasks, pd.DataFrame([new_row])], ignore_index=True)
+                    st.session_state.pending_rows.append(new_row)
                     st.success("Added!")
             
             # Boss Form
@@ -216,41 +334,47 @@ class UI:
     def render_task_editor():
         st.subheader("📝 Quest Log")
         
-        col_config = {
-            "Title": st.column_config.TextColumn(required=True),
-            "Status": st.column_config.CheckboxColumn(help="Mark done for XP"),
-            "Color": st.column_config.ColorPickerColumn()
-        }
-        
         edited_df = st.data_editor(
-            st.session_state.tasks,
-            column_config=col_config,
+            st.session_state.tasks.to_frame(),
+            column_config=UI.editor_columns(),
             use_container_width=True,
             num_rows="dynamic",
             key="quest_editor"
         )
         return edited_df
 
+    @staticmethod
+    @st.cache_resource(show_spinner=False, max_entries=4)
+    def build_calendar_events(fingerprint: tuple, _tasks: Tasks) -> List[Dict]:
+        """Converts tasks into FullCalendar events.
+
+        Cached on `fingerprint` alone (Streamlit skips hashing `_`-prefixed args), so
+        an unchanged task list is an O(1) lookup. cache_resource hands back the same
+        list without a pickle round-trip; callers must not mutate it.
+        """
+        tasks = _tasks
+        if len(tasks) == 0: return []
+        
+        # Timestamps are datetime64 arithmetic + one C-level ISO format, no per-row datetime objects
+        day = tasks.date.astype('datetime64[s]')
+        starts = np.datetime_as_string(day + _seconds_of_day(tasks.start))
+        ends = np.datetime_as_string(day + _seconds_of_day(tasks.end))
+        titles = UI.STATUS_EMOJI[tasks.status.view(np.int8)] + tasks.title.astype(str)
+        
+        return pd.DataFrame({
+            "title": titles,
+            "start": starts,
+            "end": ends,
+            "backgroundColor": tasks.color,
+            "borderColor": tasks.color,
+        }).to_dict(orient="records")
+
     @staticmethod
     def render_calendar():
         st.subheader("📅 Timeline")
-        events = []
-        for _, row in st.session_state.tasks.iterrows():
-            events.append({
-                "title": f"{'✅' if row['Status'] else '⬜'} {row['Title']}",
-                "start": datetime.combine(row['Date'], row['Start']).isoformat(),
-                "end": datetime.combine(row['Date'], row['End']).isoformat(),
-                "backgroundColor": row['Color'],
-                "borderColor": row['Color'],
-            })
+        events = UI.build_calendar_events(st.session_state.tasks_fingerprint, st.session_state.tasks)
         
-        calendar(
-            events=events, 
-            options={
-                "initialView": "timeGridWeek", 
-                "headerToolbar": {"left": "prev,next", "center": "title", "right": "dayGridMonth,timeGridWeek"}
-            }
-        )
+        calendar(events=events, options=GameConfig.CALENDAR_OPTIONS)
 
 # ==========================================
 # 5. MAIN CONTROLLER
@@ -261,22 +385,28 @@ def main():
     StateRepository.initialize_session()
     UI.render_sidebar()
     
-    stats = GamificationService.calculate_stats(st.session_state.tasks, st.session_state.boss_xp)
-    streak = GamificationService.calculate_streak(st.session_state.tasks)
+    tasks = StateRepository.get_tasks()
+    completed = int(tasks.status.sum())
+    stats = GamificationService.calculate_stats(completed, st.session_state.boss_xp)
+    streak = GamificationService.calculate_streak(tasks.date[tasks.status], date.today())
     
     UI.render_hud(stats, streak)
     UI.render_boss_arena()
     
-    new_df = UI.render_task_editor()
+    new_tasks = Tasks.from_frame(UI.render_task_editor())
+    
+    # Status drives XP/boss damage; any other edit only needs persisting
+    old_status = tasks.status
+    new_status = new_tasks.status
+    status_changed = len(new_status) != len(old_status) or not np.array_equal(new_status, old_status)
     
-    if not new_df.equals(st.session_state.tasks):
-        old_completed = st.session_state.tasks['Status'].sum()
-        new_completed = new_df['Status'].sum()
+    if status_changed or new_tasks.fingerprint() != st.session_state.get('tasks_fingerprint'):
+        new_completed = int(new_status.sum())
         
-        st.session_state.tasks = new_df
+        StateRepository.set_tasks(new_tasks)
         
-        if new_completed > old_completed:
-            diff = new_completed - old_completed
+        if new_completed > completed:
+            diff = new_completed - completed
             st.toast(f"Quest Complete! +{diff * GameConfig.XP_PER_TASK} XP")
             
             if st.session_state.active_boss:
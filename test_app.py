@@ -1,43 +1,87 @@
 import pytest
-import pandas as pd
-from datetime import date, timedelta
-from app import GamificationService, BossManager
+import numpy as np
+from datetime import date, time, timedelta
+from app import GamificationService, BossManager, Tasks, UI
 
 # --- Fixtures ---
 @pytest.fixture
 def empty_tasks():
-    return pd.DataFrame(columns=["Title", "Date", "Status"])
+    return Tasks.from_records([])
 
 @pytest.fixture
 def one_completed_task():
-    return pd.DataFrame([{"Title": "Test", "Date": date.today(), "Status": True}])
+    return Tasks.from_records([{"Title": "Test", "Date": date.today(), "Status": True}])
 
 # --- XP Tests ---
-def test_calculate_stats_zero_xp(empty_tasks):
-    stats = GamificationService.calculate_stats(empty_tasks, boss_xp=0)
+def test_calculate_stats_zero_xp():
+    stats = GamificationService.calculate_stats(0, boss_xp=0)
     assert stats['xp'] == 0
     assert stats['level'] == 1
 
-def test_calculate_stats_task_xp(one_completed_task):
-    stats = GamificationService.calculate_stats(one_completed_task, boss_xp=0)
+def test_calculate_stats_task_xp():
+    stats = GamificationService.calculate_stats(1, boss_xp=0)
     assert stats['xp'] == 50
 
+def test_calculate_stats_level_up():
+    stats = GamificationService.calculate_stats(4, boss_xp=500)
+    assert stats['xp'] == 700
+    assert stats['level'] == 2
+    assert stats['progress'] == pytest.approx(0.4)
+
 # --- Streak Tests ---
+def test_streak_no_tasks(empty_tasks):
+    assert GamificationService.calculate_streak(empty_tasks.date[empty_tasks.status]) == 0
+
 def test_streak_today_only(one_completed_task):
-    assert GamificationService.calculate_streak(one_completed_task) == 1
+    tasks = one_completed_task
+    assert GamificationService.calculate_streak(tasks.date[tasks.status]) == 1
 
 def test_streak_broken_gap():
     today = date.today()
     three_days_ago = today - timedelta(days=3)
-    df = pd.DataFrame([
+    tasks = Tasks.from_records([
         {"Date": today, "Status": True},
         {"Date": three_days_ago, "Status": True},
     ])
-    assert GamificationService.calculate_streak(df) == 1
+    assert GamificationService.calculate_streak(tasks.date[tasks.status]) == 1
+
+def test_streak_consecutive_days():
+    today = date.today()
+    tasks = Tasks.from_records([
+        {"Date": today - timedelta(days=1), "Status": True},
+        {"Date": today - timedelta(days=2), "Status": True},
+        {"Date": today - timedelta(days=2), "Status": True},
+        {"Date": today - timedelta(days=3), "Status": True},
+        {"Date": today - timedelta(days=5), "Status": True},
+    ])
+    assert GamificationService.calculate_streak(tasks.date[tasks.status]) == 3
+
+# --- Task Store Tests ---
+def test_tasks_frame_round_trip(one_completed_task):
+    df = one_completed_task.to_frame()
+    assert df.loc[0, 'Date'] == date.today()
+    assert Tasks.from_frame(df).fingerprint() == one_completed_task.fingerprint()
+
+def test_tasks_blank_status_is_not_done():
+    tasks = Tasks.from_records([{"Status": None}, {"Status": np.nan}, {"Status": True}])
+    assert tasks.status.tolist() == [False, False, True]
+
+# --- Calendar Tests ---
+def test_calendar_events_iso_timestamps():
+    tasks = Tasks.from_records([
+        {"Title": "Standup", "Date": date(2024, 1, 2), "Start": time(9, 15), "End": time(9, 30), "Status": False, "Color": "#111"},
+    ])
+    assert UI.build_calendar_events(tasks.fingerprint(), tasks) == [{
+        "title": "⬜ Standup",
+        "start": "2024-01-02T09:15:00",
+        "end": "2024-01-02T09:30:00",
+        "backgroundColor": "#111",
+        "borderColor": "#111",
+    }]
 
 # --- Boss Tests ---
 def test_boss_damage():
     boss = {"Name": "Test Boss", "MaxHP": 100, "CurrentHP": 100}
     updated_boss, dmg = BossManager.deal_damage(boss, 2)
     assert dmg == 20
-    assert updated_boss['CurrentHP'] == 80
\ No newline at end of file
+    assert updated_boss['CurrentHP'] == 80